@@ -12,19 +12,33 @@ Analyzes scanned documents in data/images/documents/ to extract:
 Features:
 - SDK: Google Gen AI (the modern SDK)
 - Checkpointing: Resume from last processed file
-- Structured Export: Saves to CSV and Excel
-- Rate Limit Handling: Gracefully handles 429 errors
+- Dedupe: Byte-identical scans reuse an earlier result instead of a new API call
+- Structured Export: Appends to CSV per checkpoint, rebuilds Excel at end of run
+- Rate Limit Handling: Retries 429 errors with exponential backoff + jitter
+- Batch Mode: --batch submits everything as one Batch API job (50% cost)
+- Concurrency: Overlaps GEMINI_CONCURRENCY requests (default 5) via asyncio,
+  each carrying GEMINI_IMAGES_PER_REQUEST images (default 4)
 """
 
+import io
 import os
-import json
+import base64
+import hashlib
+import argparse
+import orjson
+import re
 import time
+import random
+import asyncio
 import logging
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from google import genai
 from google.genai import types
-from PIL import Image
+from PIL import Image, ImageOps
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
 from tqdm import tqdm
 import sys
@@ -41,8 +55,47 @@ STATE_FILE = PROCESSED_DIR / "analysis_state.json"
 RESULTS_CSV = PROCESSED_DIR / "evidence_analysis.csv"
 RESULTS_XLSX = PROCESSED_DIR / "evidence_analysis.xlsx"
 MODEL_CACHE = PROCESSED_DIR / "last_working_model.txt"
+BATCH_REQUESTS = PROCESSED_DIR / "batch_requests.jsonl"
+BATCH_JOB_FILE = PROCESSED_DIR / "batch_job.txt"     # pending job name, for resume
+BATCH_DIGESTS = PROCESSED_DIR / "batch_digests.json"  # content hashes of the pending job's scans
 
-# The Prompt
+BATCH_POLL_SECONDS = 30
+BATCH_DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED",
+                     "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+# Scan file types picked up from DOCS_DIR
+DOC_IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+
+# Column order of evidence_analysis.csv
+RESULT_COLUMNS = ["document_type", "entities_found", "person_detection", "key_findings",
+                  "importance_score", "reasoning", "file_name", "file_path", "analyzed_at"]
+
+# Number of Gemini requests kept in flight at once
+CONCURRENCY = int(os.environ.get("GEMINI_CONCURRENCY", "5"))
+
+# Images sent together in one generate_content call (1 = one image per request)
+IMAGES_PER_REQUEST = int(os.environ.get("GEMINI_IMAGES_PER_REQUEST", "4"))
+
+# Threads reading/downscaling images ahead of the API workers
+PREP_WORKERS = 4
+
+# Parallel model-quota probes at startup
+PROBE_WORKERS = 4
+
+# Rate-limit (429) retries: exponential backoff with jitter, capped
+MAX_ATTEMPTS = 6
+BACKOFF_INITIAL = 2     # seconds
+BACKOFF_MAX = 120       # seconds
+
+# Matches Gemini's retry hint, e.g. "'retryDelay': '37s'" or "Please retry in 37.5s"
+RETRY_HINT_RE = re.compile(r"retry(?:Delay['\"]?:\s*['\"]|\s+in\s+)(\d+(?:\.\d+)?)s", re.IGNORECASE)
+
+# Images are downscaled to fit this box before upload; smaller files go as-is
+UPLOAD_MAX_SIDE = 1568
+UPLOAD_MIN_BYTES = 200_000
+
+# The Prompt — sent as the system instruction, identical across requests so
+# Gemini's implicit prefix caching can reuse it
 ANALYSIS_PROMPT = """
 Analyze this document scan from the Epstein case files. 
 Extract structured intelligence about the contents.
@@ -58,6 +111,25 @@ Provide your response in JSON format with the following keys:
 Return ONLY the raw JSON.
 """
 
+# Appended to the prompt when several images share one request
+ANALYSIS_PROMPT_MULTI = ANALYSIS_PROMPT + """
+You will receive several document scans, each preceded by a label 'Image N'.
+Analyze each one independently and return a JSON array with exactly one object
+per image, in the same order as the images.
+"""
+
+class DocResult(BaseModel):
+    """Response schema enforced on Gemini output (structured JSON)."""
+    document_type: str
+    entities_found: list[str]
+    person_detection: str
+    key_findings: str
+    importance_score: int
+    reasoning: str
+
+# JSON Schema form of DocResult, for raw Batch API requests
+DOC_RESULT_SCHEMA = DocResult.model_json_schema()
+
 # ── Logging ───────────────────────────────────────────────────────────────────
 
 # Suppress noisy HTTP/AFC logs from google-genai SDK
@@ -77,52 +149,461 @@ def load_state():
     """Load the progress state."""
     if STATE_FILE.exists():
         try:
-            return json.loads(STATE_FILE.read_text())
-        except:
+            return orjson.loads(STATE_FILE.read_bytes())
+        except (orjson.JSONDecodeError, OSError) as e:
+            log.warning(f"⚠️ Could not read {STATE_FILE.name}, starting fresh: {e}")
             return {"processed_files": [], "last_file": None}
     return {"processed_files": [], "last_file": None}
 
-def save_state(processed_files, last_file):
-    """Save the progress state."""
+def save_state(processed_files, last_file, file_hashes):
+    """Save the progress state (compact JSON — this runs at every checkpoint)."""
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps({
+    STATE_FILE.write_bytes(orjson.dumps({
         "processed_files": list(processed_files),
         "last_file": str(last_file),
         "total_processed": len(processed_files),
+        "file_hashes": file_hashes,
         "updated_at": time.ctime()
-    }, indent=2))
+    }))
 
 def save_results(results_list):
-    """Append results to CSV and update Excel."""
+    """Append results to the CSV (only the new rows are written)."""
     if not results_list:
         return
-        
-    df = pd.DataFrame(results_list)
-    
-    # Save CSV (Append if exists)
+
+    # Keep the on-disk column order so appended rows line up with the header
     if RESULTS_CSV.exists():
-        try:
-            existing_df = pd.read_csv(RESULTS_CSV)
-            df = pd.concat([existing_df, df], ignore_index=True).drop_duplicates(subset=["file_name"])
-        except:
-            pass
-    
-    df.to_csv(RESULTS_CSV, index=False)
-    
-    # Save Excel
+        columns = list(pd.read_csv(RESULTS_CSV, nrows=0).columns)
+        header = False
+    else:
+        columns = RESULT_COLUMNS
+        header = True
+
+    df = pd.DataFrame(results_list).reindex(columns=columns)
+    df.to_csv(RESULTS_CSV, mode="a", header=header, index=False)
+
+def export_excel():
+    """Rebuild the Excel export from the full CSV (end of run or --export-excel, never per batch)."""
+    if not RESULTS_CSV.exists():
+        return
     try:
+        df = pd.read_csv(RESULTS_CSV).drop_duplicates(subset=["file_name"], keep="last")
         df.to_excel(RESULTS_XLSX, index=False, engine='openpyxl')
         log.info(f"📁 Updated {RESULTS_XLSX.name}")
     except Exception as e:
         log.warning(f"⚠️ Could not save Excel: {e}")
 
+def prep_image(img_path, max_side=UPLOAD_MAX_SIDE):
+    """
+    Return (bytes, mime_type, digest) for upload, downscaling large scans to a JPEG
+    of at most max_side px. digest is a content hash of the original file.
+    """
+    raw = img_path.read_bytes()
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    if len(raw) < UPLOAD_MIN_BYTES:
+        mime = 'image/png' if img_path.suffix.lower() == '.png' else 'image/jpeg'
+        return raw, mime, digest
+    with Image.open(io.BytesIO(raw)) as im:
+        upright = ImageOps.exif_transpose(im)   # the re-encoded JPEG carries no EXIF orientation
+        upright.thumbnail((max_side, max_side), Image.LANCZOS)
+        buf = io.BytesIO()
+        upright.convert("RGB").save(buf, "JPEG", quality=85)
+    return buf.getvalue(), 'image/jpeg', digest
+
+def load_batch_digests(to_process):
+    """{file name: content hash} saved with the pending batch job, re-hashing the scans if it is missing."""
+    try:
+        return orjson.loads(BATCH_DIGESTS.read_bytes())
+    except (orjson.JSONDecodeError, OSError):
+        log.info("   Re-hashing scans for the resumed job...")
+        return {p.name: hashlib.blake2b(p.read_bytes(), digest_size=16).hexdigest()
+                for p in to_process if p.exists()}
+
+def load_known_results(file_hashes):
+    """Map content hash → earlier result row, so duplicate scans reuse a previous analysis."""
+    if not file_hashes or not RESULTS_CSV.exists():
+        return {}
+    df = pd.read_csv(RESULTS_CSV).drop_duplicates(subset=["file_name"], keep="last")
+    by_name = {row["file_name"]: row for row in df.to_dict("records")}
+    return {h: by_name[name] for name, h in file_hashes.items() if name in by_name}
+
+def reuse_result(known_result, img_path):
+    """Copy an earlier analysis onto a byte-identical scan."""
+    result = {k: v for k, v in known_result.items() if k in DocResult.model_fields}
+    return add_metadata(result, img_path)
+
+def parse_result_text(img_path, text_content):
+    """Validate a raw structured-output response against DocResult. Returns a dict or None."""
+    try:
+        return DocResult.model_validate_json(text_content).model_dump()
+    except ValidationError as e:
+        log.error(f"❌ Failed to parse JSON for {img_path.name}: {e}")
+        return None
+
+def add_metadata(result, img_path):
+    """Attach file metadata columns to an analysis result."""
+    result['file_name'] = img_path.name
+    result['file_path'] = str(img_path.relative_to(BASE_DIR))
+    result['analyzed_at'] = time.ctime()
+    return result
+
+def cool(seconds, msg):
+    """Log once and sleep for the whole wait (no per-second countdown redraws)."""
+    log.warning(f"⏳ {msg} ({seconds}s)...")
+    time.sleep(seconds)
+
+def probe_model(client, model):
+    """True if a tiny request to the model succeeds (i.e. it has quota left)."""
+    try:
+        client.models.generate_content(model=model, contents="ok")
+        return True
+    except Exception as e:
+        err_msg = str(e).lower()
+        if not ("exhausted" in err_msg or "limit: 0" in err_msg or "429" in err_msg):
+            log.warning(f"⚠️ Could not use {model}: {e}")
+        return False
+
+def is_rate_limit(e):
+    """True if the exception is a Gemini quota / rate-limit error."""
+    msg = str(e)
+    return "429" in msg or "RESOURCE_EXHAUSTED" in msg
+
+def backoff_delay(e, attempt):
+    """Seconds to wait before retrying: the server's hint if present, else exponential backoff with jitter."""
+    hint = RETRY_HINT_RE.search(str(e))
+    if hint:
+        delay = float(hint.group(1))
+    else:
+        delay = BACKOFF_INITIAL * 2 ** (attempt - 1)
+    return min(delay, BACKOFF_MAX) + random.uniform(0, 1)
+
+async def generate_with_backoff(client, label, **kwargs):
+    """Call generate_content, retrying rate-limit errors with backoff. Other errors propagate."""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return await client.aio.models.generate_content(**kwargs)
+        except Exception as e:
+            if not is_rate_limit(e) or attempt == MAX_ATTEMPTS:
+                raise
+            delay = backoff_delay(e, attempt)
+            log.warning(f"⏳ Rate limit hit on {label}. Retrying in {delay:.1f}s ({attempt}/{MAX_ATTEMPTS})...")
+            await asyncio.sleep(delay)
+
+async def analyze_one(client, model_id, img_path, img_bytes, mime_type):
+    """Send one prepared image to Gemini and return its result dict (or None)."""
+    try:
+        response = await generate_with_backoff(
+            client, img_path.name,
+            model=model_id,
+            contents=[types.Part.from_bytes(data=img_bytes, mime_type=mime_type)],
+            config=types.GenerateContentConfig(
+                system_instruction=ANALYSIS_PROMPT,
+                response_mime_type='application/json',
+                response_schema=DocResult,
+            )
+        )
+    except Exception as e:
+        log.error(f"❌ Error analyzing '{img_path.name}': {e}")
+        return None
+
+    # The SDK validates the response against DocResult
+    if response.parsed is None:
+        log.error(f"❌ Failed to parse JSON for {img_path.name}: no structured output returned")
+        return None
+    return add_metadata(response.parsed.model_dump(), img_path)
+
+async def analyze_group(client, model_id, group):
+    """Send a group of prepared images in one request; return [(img_path, result or None), ...] in order."""
+    if len(group) == 1:
+        img_path, (img_bytes, mime_type, _) = group[0]
+        return [(img_path, await analyze_one(client, model_id, img_path, img_bytes, mime_type))]
+
+    contents = []
+    for n, (img_path, (img_bytes, mime_type, _)) in enumerate(group):
+        contents.append(f"Image {n}:")
+        contents.append(types.Part.from_bytes(data=img_bytes, mime_type=mime_type))
+    label = f"{group[0][0].name} (+{len(group) - 1} more)"
+
+    try:
+        response = await generate_with_backoff(
+            client, label,
+            model=model_id,
+            contents=contents,
+            config=types.GenerateContentConfig(
+                system_instruction=ANALYSIS_PROMPT_MULTI,
+                response_mime_type='application/json',
+                response_schema=list[DocResult],
+            )
+        )
+    except Exception as e:
+        log.error(f"❌ Error analyzing '{label}': {e}")
+        return [(img_path, None) for img_path, _ in group]
+
+    parsed = response.parsed
+    if not isinstance(parsed, list) or len(parsed) != len(group):
+        got = len(parsed) if isinstance(parsed, list) else "no"
+        log.error(f"❌ Expected {len(group)} results for '{label}', got {got}")
+        return [(img_path, None) for img_path, _ in group]
+    return [(img_path, add_metadata(r.model_dump(), img_path)) for (img_path, _), r in zip(group, parsed)]
+
+def prep_or_none(img_path):
+    """prep_image(), logging and returning None for unreadable or undecodable files."""
+    try:
+        return prep_image(img_path)
+    except (OSError, Image.DecompressionBombError, ValueError) as e:
+        log.error(f"❌ Could not read '{img_path.name}': {e}")
+        return None
+
+async def prepare_images(to_process, queue):
+    """Producer: read/downscale images on a thread pool and queue them in groups of IMAGES_PER_REQUEST."""
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    group = []
+
+    async def take():
+        nonlocal group
+        path, fut = pending.popleft()
+        group.append((path, await fut))
+        if len(group) >= IMAGES_PER_REQUEST:
+            await queue.put(group)
+            group = []
+
+    with ThreadPoolExecutor(max_workers=PREP_WORKERS) as pool:
+        for img_path in to_process:
+            pending.append((img_path, loop.run_in_executor(pool, prep_or_none, img_path)))
+            if len(pending) >= PREP_WORKERS:
+                await take()
+        while pending:
+            await take()
+    if group:
+        await queue.put(group)
+    # One stop marker per worker
+    for _ in range(CONCURRENCY):
+        await queue.put(None)
+
+async def analyze_all(client, model_id, to_process, processed_files, file_hashes):
+    """Analyze images with CONCURRENCY workers fed by a prefetching producer, checkpointing as they finish."""
+    queue = asyncio.Queue(maxsize=2 * CONCURRENCY)
+    known = load_known_results(file_hashes)
+    current_batch = []
+    batch_size = 5 # Save every 5 images
+    last_file = None
+
+    pbar = tqdm(
+        total=len(to_process),
+        desc="🔍 Analyzing",
+        unit="img",
+        bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]",
+        ncols=90
+    )
+
+    def record(img_path, result, digest=None):
+        nonlocal current_batch, last_file
+        pbar.update(1)
+        pbar.set_postfix_str(img_path.name[-30:], refresh=True)
+        # processed_files is the dedupe key — never write a file's row twice
+        if result is None or img_path.name in processed_files:
+            return
+
+        current_batch.append(result)
+        processed_files.add(img_path.name)
+        last_file = img_path.name
+        if digest:
+            file_hashes[img_path.name] = digest
+            known.setdefault(digest, result)
+
+        # Checkpointing
+        if len(current_batch) >= batch_size:
+            save_results(current_batch)
+            save_state(processed_files, last_file, file_hashes)
+            current_batch = []
+            pbar.set_postfix_str(f"💾 Saved ({len(processed_files)} total)", refresh=True)
+
+    # Content hash → future of the result for a scan still being analyzed
+    in_flight = {}
+
+    async def worker():
+        loop = asyncio.get_running_loop()
+        while (group := await queue.get()) is not None:
+            ready, copies = [], []
+            for img_path, prepped in group:
+                if prepped is None:
+                    record(img_path, None)
+                elif prepped[2] in known:
+                    # Byte-identical to a scan we already analyzed — no API call
+                    record(img_path, reuse_result(known[prepped[2]], img_path), prepped[2])
+                elif prepped[2] in in_flight:
+                    # Same bytes as a scan another request is sending — wait for its answer
+                    copies.append((img_path, prepped[2], in_flight[prepped[2]]))
+                else:
+                    in_flight[prepped[2]] = loop.create_future()
+                    ready.append((img_path, prepped))
+            if ready:
+                digests = {img_path: prepped[2] for img_path, prepped in ready}
+                try:
+                    for img_path, result in await analyze_group(client, model_id, ready):
+                        record(img_path, result, digests[img_path])
+                        in_flight.pop(digests[img_path]).set_result(result)
+                finally:
+                    for digest in digests.values():
+                        if digest in in_flight:
+                            in_flight.pop(digest).set_result(None)
+            for img_path, digest, original in copies:
+                # A failed original leaves its copies for the next run
+                result = await original
+                record(img_path, result and reuse_result(result, img_path), digest)
+
+    tasks = [asyncio.create_task(prepare_images(to_process, queue))]
+    tasks += [asyncio.create_task(worker()) for _ in range(CONCURRENCY)]
+
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        pbar.close()
+        if current_batch:
+            save_results(current_batch)
+            save_state(processed_files, last_file, file_hashes)
+
+# ── Batch Mode ────────────────────────────────────────────────────────────────
+
+def write_batch_requests(to_process, known):
+    """
+    Write one Batch API request per image to BATCH_REQUESTS (JSONL, keyed by file name).
+    Scans whose content hash is already known, or already queued, are not written.
+    Returns ({file name: content hash} for every readable image, number of requests written).
+    """
+    digests = {}
+    queued = set(known)
+    n_requests = 0
+    with BATCH_REQUESTS.open("wb") as f, \
+            ThreadPoolExecutor(max_workers=PREP_WORKERS) as pool:
+        prepared = pool.map(prep_or_none, to_process)
+        for img_path, prepped in tqdm(zip(to_process, prepared), total=len(to_process),
+                                      desc="📦 Packing", unit="img", ncols=90):
+            if prepped is None:
+                continue
+            img_bytes, mime_type, digest = prepped
+            digests[img_path.name] = digest
+            if digest in queued:
+                continue
+            queued.add(digest)
+            n_requests += 1
+            f.write(orjson.dumps({
+                "key": img_path.name,
+                "request": {
+                    "systemInstruction": {"parts": [{"text": ANALYSIS_PROMPT}]},
+                    "contents": [{"parts": [
+                        {"inlineData": {"mimeType": mime_type,
+                                        "data": base64.b64encode(img_bytes).decode("ascii")}},
+                    ]}],
+                    "generationConfig": {
+                        "responseMimeType": "application/json",
+                        "responseJsonSchema": DOC_RESULT_SCHEMA,
+                    },
+                },
+            }, option=orjson.OPT_APPEND_NEWLINE))
+    return digests, n_requests
+
+def wait_for_batch(client, job, to_process, processed_files, file_hashes, known, digests):
+    """Poll a batch job until it finishes; return its parsed result rows, or None if it failed."""
+    while job.state.name not in BATCH_DONE_STATES:
+        log.info(f"   ⏳ {job.state.name} — checking again in {BATCH_POLL_SECONDS}s")
+        time.sleep(BATCH_POLL_SECONDS)
+        job = client.batches.get(name=job.name)
+
+    BATCH_JOB_FILE.unlink()
+    BATCH_DIGESTS.unlink(missing_ok=True)
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        log.error(f"❌ Batch job ended with {job.state.name}: {job.error}")
+        return None
+
+    by_name = {p.name: p for p in to_process}
+    output = client.files.download(file=job.dest.file_name)
+    results = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        row = orjson.loads(line)
+        img_path = by_name.get(row.get("key"))
+        if img_path is None or img_path.name in processed_files:
+            continue
+        try:
+            text_content = row["response"]["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            log.error(f"❌ Error analyzing '{img_path.name}': {row.get('error', 'empty response')}")
+            continue
+        result = parse_result_text(img_path, text_content)
+        if result is None:
+            continue
+        results.append(add_metadata(result, img_path))
+        processed_files.add(img_path.name)
+        if img_path.name in digests:
+            file_hashes[img_path.name] = digests[img_path.name]
+            known.setdefault(digests[img_path.name], result)
+    return results
+
+def run_batch(client, model_id, to_process, processed_files, file_hashes):
+    """Analyze all images as a single Gemini Batch API job, then save the results."""
+    known = load_known_results(file_hashes)
+    job = None
+    if BATCH_JOB_FILE.exists():
+        job = client.batches.get(name=BATCH_JOB_FILE.read_text().strip())
+        digests = load_batch_digests(to_process)
+        log.info(f"🔁 Resuming batch job {job.name}")
+    else:
+        digests, n_requests = write_batch_requests(to_process, known)
+        if n_requests:
+            uploaded = client.files.upload(
+                file=str(BATCH_REQUESTS),
+                config=types.UploadFileConfig(display_name="epstein-batch-requests", mime_type="jsonl"),
+            )
+            job = client.batches.create(model=model_id, src=uploaded.name,
+                                        config={"display_name": "epstein"})
+            BATCH_DIGESTS.write_bytes(orjson.dumps(digests))
+            BATCH_JOB_FILE.write_text(job.name)
+            log.info(f"📤 Submitted batch job {job.name} ({n_requests} of {len(to_process)} images)")
+        else:
+            log.info("ℹ️ Every remaining scan duplicates one already analyzed — no batch job needed")
+
+    results = []
+    if job is not None:
+        results = wait_for_batch(client, job, to_process, processed_files, file_hashes, known, digests)
+        if results is None:
+            return
+
+    # Duplicates that were left out of the job take the original's result
+    for img_path in to_process:
+        digest = digests.get(img_path.name)
+        if img_path.name not in processed_files and digest in known:
+            results.append(reuse_result(known[digest], img_path))
+            processed_files.add(img_path.name)
+            file_hashes[img_path.name] = digest
+
+    save_results(results)
+    if results:
+        save_state(processed_files, results[-1]["file_name"], file_hashes)
+    log.info(f"✅ Batch complete: {len(results)}/{len(to_process)} images analyzed")
+
 # ── Main Analysis ──────────────────────────────────────────────────────────────
 
 def main():
+    parser = argparse.ArgumentParser(description="AI evidence analysis of document scans via Gemini.")
+    parser.add_argument("--batch", action="store_true",
+                        help="submit all remaining images as one Gemini Batch API job (half cost, slower turnaround)")
+    parser.add_argument("--export-excel", action="store_true",
+                        help="only rebuild evidence_analysis.xlsx from the CSV, then exit")
+    args = parser.parse_args()
+
     log.info("="*60)
     log.info("  EPSTEIN FILES — AI DOCUMENT ANALYSIS")
     log.info("="*60)
 
+    if args.export_excel:
+        export_excel()
+        return
+
     if not DOCS_DIR.exists():
         log.error(f"❌ Documents directory not found: {DOCS_DIR}")
         return
@@ -161,7 +642,8 @@ def main():
             client.models.generate_content(model=cached, contents="ok")
             model_id = cached
             log.info(f"✅ Using cached model: {model_id}")
-        except:
+        except Exception as e:
+            log.debug(f"   Cached model probe failed: {e}")
             log.info(f"   Cached model '{cached}' no longer available. Searching...")
     
     # --- If no cache hit, search all models with retries ---
@@ -169,26 +651,21 @@ def main():
         MAX_RETRIES = 3
         for attempt in range(1, MAX_RETRIES + 1):
             log.info(f"   Attempt {attempt}/{MAX_RETRIES}: Testing model quotas...")
-            for m in candidate_models:
-                try:
-                    client.models.generate_content(model=m, contents="ok")
-                    model_id = m
+            # Probe candidates in parallel; take the first one that answers
+            ex = ThreadPoolExecutor(max_workers=PROBE_WORKERS)
+            futures = {ex.submit(probe_model, client, m): m for m in candidate_models}
+            for fut in as_completed(futures):
+                if fut.result():
+                    model_id = futures[fut]
                     log.info(f"✅ Found working model: {model_id}")
                     break
-                except Exception as e:
-                    err_msg = str(e).lower()
-                    if "exhausted" in err_msg or "limit: 0" in err_msg or "429" in err_msg:
-                        continue
-                    log.warning(f"⚠️ Could not use {m}: {e}")
+            ex.shutdown(wait=False, cancel_futures=True)
             
             if model_id:
                 break
             
             if attempt < MAX_RETRIES:
-                log.warning("⏳ All models rate-limited. Waiting 60s for per-minute quota to reset...")
-                for sec in tqdm(range(60, 0, -1), desc="⏳ Waiting", unit="s", 
-                               bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}s", ncols=60):
-                    time.sleep(1)
+                cool(60, "All models rate-limited. Waiting for per-minute quota to reset")
             else:
                 log.error("❌ DAILY LIMIT REACHED — All vision models exhausted after 3 retries.")
                 log.error("   Your free daily quota is used up. Try again tomorrow!")
@@ -200,9 +677,13 @@ def main():
 
     state = load_state()
     processed_files = set(state.get("processed_files", []))
+    file_hashes = state.get("file_hashes", {})
+    already_done = len(processed_files)
     
-    # Get all images
-    all_images = sorted([f for f in DOCS_DIR.iterdir() if f.suffix.lower() in ('.jpg', '.jpeg', '.png')])
+    # Get all images (scandir: no Path objects built for non-image entries)
+    with os.scandir(DOCS_DIR) as it:
+        names = sorted(e.name for e in it if e.name.lower().endswith(DOC_IMAGE_EXTS) and e.is_file())
+    all_images = [DOCS_DIR / n for n in names]
     to_process = [f for f in all_images if f.name not in processed_files]
 
     if not to_process:
@@ -210,100 +691,26 @@ def main():
         return
 
     log.info(f"📊 Found {len(all_images)} total images. {len(to_process)} remaining to process.")
-    log.info("🚀 Starting analysis... (Ctrl+C to stop safely)")
 
-    current_batch = []
-    batch_size = 5 # Save every 5 images
-    
-    pbar = tqdm(
-        to_process,
-        desc="🔍 Analyzing",
-        unit="img",
-        bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]",
-        ncols=90
-    )
-    
-    try:
-        for i, img_path in enumerate(pbar):
-            pbar.set_postfix_str(img_path.name[-30:], refresh=True)
-            
-            try:
-                # Load image as bytes
-                with open(img_path, 'rb') as f:
-                    img_bytes = f.read()
-                
-                # Send to Gemini
-                response = client.models.generate_content(
-                    model=model_id,
-                    contents=[
-                        ANALYSIS_PROMPT,
-                        types.Part.from_bytes(data=img_bytes, mime_type='image/jpeg')
-                    ],
-                    config=types.GenerateContentConfig(
-                        response_mime_type='application/json',
-                    )
-                )
-                
-                # Parse JSON response
-                result = response.parsed if hasattr(response, 'parsed') else None
-                
-                # If parsed is None, try manual text parsing
-                if result is None:
-                    text_content = response.text
-                    clean_text = text_content.replace('```json', '').replace('```', '').strip()
-                    try:
-                        result = json.loads(clean_text)
-                    except Exception as e:
-                        log.error(f"❌ Failed to parse JSON for {img_path.name}: {e}")
-                        continue
-                
-                if not isinstance(result, dict):
-                    log.error(f"❌ Result for {img_path.name} is not a dictionary: {type(result)}")
-                    continue
-                
-                # Add metadata
-                result['file_name'] = img_path.name
-                result['file_path'] = str(img_path.relative_to(BASE_DIR))
-                result['analyzed_at'] = time.ctime()
-                
-                current_batch.append(result)
-                processed_files.add(img_path.name)
-                
-                # Checkpointing
-                if len(current_batch) >= batch_size:
-                    save_results(current_batch)
-                    save_state(processed_files, img_path.name)
-                    current_batch = []
-                    pbar.set_postfix_str(f"💾 Saved ({len(processed_files)} total)", refresh=True)
-
-                # Cooldown with visible countdown
-                for sec in range(10, 0, -1):
-                    pbar.set_postfix_str(f"⏳ {sec}s cooldown", refresh=True)
-                    time.sleep(1)
-
-            except Exception as e:
-                if "429" in str(e):
-                    log.warning("⏳ Rate limit hit. Waiting 60s...")
-                    for sec in tqdm(range(60, 0, -1), desc="⏳ Cooldown", unit="s",
-                                   bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt}s", ncols=60,
-                                   file=sys.stderr):
-                        time.sleep(1)
-                    # Retry the same image
-                    pbar.update(-1)
-                    continue
-                log.error(f"❌ Error analyzing '{img_path.name}': {e}")
-                continue
+    if args.batch:
+        try:
+            run_batch(client, model_id, to_process, processed_files, file_hashes)
+        except KeyboardInterrupt:
+            log.info("\n🛑 User interrupted. Run again with --batch to resume waiting for the job.")
+        finally:
+            if len(processed_files) > already_done:
+                export_excel()
+        return
 
+    log.info(f"🚀 Starting analysis with {CONCURRENCY} concurrent requests... (Ctrl+C to stop safely)")
+
+    try:
+        asyncio.run(analyze_all(client, model_id, to_process, processed_files, file_hashes))
     except KeyboardInterrupt:
-        log.info("\n🛑 User interrupted. Saving progress...")
-    
+        log.info("\n🛑 User interrupted. Progress saved.")
     finally:
-        if current_batch:
-            save_results(current_batch)
-            if 'i' in locals() and i < len(to_process):
-                save_state(processed_files, to_process[i].name)
-            elif to_process:
-                save_state(processed_files, to_process[-1].name)
+        if len(processed_files) > already_done:
+            export_excel()
         log.info("🏁 Analysis paused. Run script again to resume.")
 
 if __name__ == "__main__":
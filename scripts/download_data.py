@@ -20,13 +20,18 @@ Usage:
 
 import os
 import sys
-import json
-import time
+import orjson
+import shutil
 import logging
 import requests
 import subprocess
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+# The one image_index.json writer, shared so both scripts walk and key images the same way
+from sync_images import build_image_index
 
 # ── Configuration ──────────────────────────────────────────────────────────────
 
@@ -46,6 +51,11 @@ FOLDERS = {
     "processed": DATA_DIR / "processed",
 }
 
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+# Parallel download workers (downloads are I/O-bound)
+DOWNLOAD_WORKERS = 8
+
 # Primary data sources — epsteininvestigation.org (no auth required)
 ARCHIVE_DOWNLOADS = {
     "entities": {
@@ -125,6 +135,22 @@ logging.basicConfig(
 )
 log = logging.getLogger("epstein_downloader")
 
+# ── HTTP Session ───────────────────────────────────────────────────────────────
+
+# One pooled session for all downloads: reuses TCP/TLS connections and retries
+# transient errors (429/5xx) with backoff
+SESSION = requests.Session()
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Research/Academic - Epstein Files Dashboard)"
+})
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
 # ── Helper Functions ───────────────────────────────────────────────────────────
 
 
@@ -143,18 +169,13 @@ def download_file(url, dest_path, description="file"):
     log.info(f"   URL: {url}")
 
     try:
-        response = requests.get(url, stream=True, timeout=120, headers={
-            "User-Agent": "Mozilla/5.0 (Research/Academic - Epstein Files Dashboard)"
-        })
+        response = SESSION.get(url, stream=True, timeout=120)
         response.raise_for_status()
 
-        total_size = int(response.headers.get("content-length", 0))
-        downloaded = 0
-
+        # Stream straight to disk in 1 MiB blocks (decoding gzip/deflate if sent)
+        response.raw.decode_content = True
         with open(dest_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-                downloaded += len(chunk)
+            shutil.copyfileobj(response.raw, f, length=1 << 20)
 
         size_mb = dest_path.stat().st_size / (1024 * 1024)
         log.info(f"   ✅ Saved: {dest_path.name} ({size_mb:.2f} MB)")
@@ -179,6 +200,7 @@ def download_archive_sources():
     log.info("=" * 60 + "\n")
 
     results = {}
+    tasks = []
     for key, config in ARCHIVE_DOWNLOADS.items():
         dest_path = FOLDERS[config["destination"]] / config["filename"]
 
@@ -187,9 +209,11 @@ def download_archive_sources():
             results[key] = True
             continue
 
-        success = download_file(config["url"], dest_path, config["description"])
-        results[key] = success
-        time.sleep(1)  # Respectful rate limiting
+        tasks.append((key, config["url"], dest_path, config["description"]))
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as ex:
+        for key, success in ex.map(lambda t: (t[0], download_file(*t[1:])), tasks):
+            results[key] = success
 
     return results
 
@@ -284,8 +308,7 @@ def download_images():
     for repo_url in repos_to_check:
         log.info(f"🖼️  Checking archive for images...")
         try:
-            response = requests.get(repo_url, timeout=30, headers={
-                "User-Agent": "Mozilla/5.0 (Research/Academic)",
+            response = SESSION.get(repo_url, timeout=30, headers={
                 "Accept": "application/vnd.github.v3+json",
             })
 
@@ -297,20 +320,21 @@ def download_images():
 
                 for img_dir in img_dirs:
                     log.info(f"   📂 Found directory: {img_dir['name']}")
-                    sub_resp = requests.get(img_dir["url"], timeout=30, headers={
-                        "User-Agent": "Mozilla/5.0",
+                    sub_resp = SESSION.get(img_dir["url"], timeout=30, headers={
                         "Accept": "application/vnd.github.v3+json",
                     })
                     if sub_resp.status_code == 200:
                         sub_items = sub_resp.json()
                         images = [i for i in sub_items if i.get("type") == "file"
-                                 and i["name"].lower().endswith((".jpg", ".jpeg", ".png", ".gif", ".webp"))]
+                                 and i["name"].lower().endswith(IMAGE_EXTS)]
                         log.info(f"      Found {len(images)} images")
+                        tasks = []
                         for img in images[:100]:
                             dest_file = FOLDERS["images_victims"] / img["name"]
                             if not dest_file.exists() and img.get("download_url"):
-                                download_file(img["download_url"], dest_file, img["name"])
-                                time.sleep(0.5)
+                                tasks.append((img["download_url"], dest_file, img["name"]))
+                        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as ex:
+                            list(ex.map(lambda t: download_file(*t), tasks))
             else:
                 log.info(f"   Could not access (HTTP {response.status_code})")
         except Exception as e:
@@ -326,40 +350,10 @@ def save_doj_metadata():
     """Save DOJ dataset structure metadata."""
     log.info("\n📋 Saving DOJ dataset metadata...")
     meta_path = FOLDERS["raw"] / "doj_datasets_metadata.json"
-    with open(meta_path, "w") as f:
-        json.dump(DOJ_DATASETS_META, f, indent=2)
+    meta_path.write_bytes(orjson.dumps(DOJ_DATASETS_META, option=orjson.OPT_INDENT_2))
     log.info(f"   ✅ Saved to {meta_path.relative_to(BASE_DIR)}")
 
 
-def build_image_index():
-    """Build an index mapping of available images to persons/records."""
-    log.info("\n🔗 Building image index...")
-
-    image_index = {}
-    images_dir = FOLDERS["images"]
-
-    for img_path in images_dir.rglob("*"):
-        if img_path.is_file() and img_path.suffix.lower() in (".jpg", ".jpeg", ".png", ".gif", ".webp"):
-            name_key = img_path.stem.replace("_", " ").replace("-", " ").strip().title()
-            rel_path = str(img_path.relative_to(BASE_DIR))
-
-            if name_key not in image_index:
-                image_index[name_key] = []
-            image_index[name_key].append({
-                "path": rel_path,
-                "filename": img_path.name,
-                "category": img_path.parent.name,
-                "size_bytes": img_path.stat().st_size,
-            })
-
-    index_path = FOLDERS["processed"] / "image_index.json"
-    with open(index_path, "w") as f:
-        json.dump(image_index, f, indent=2)
-
-    log.info(f"   ✅ Indexed {len(image_index)} unique names with images")
-    return image_index
-
-
 # ── Main ───────────────────────────────────────────────────────────────────────
 
 def main():
@@ -10,12 +10,22 @@ Usage:
 """
 
 import os
-import json
+import sys
 import csv
+import mmap
+import orjson
 import re
 import logging
 from pathlib import Path
 from collections import Counter, defaultdict
+from functools import lru_cache
+from heapq import nlargest
+from itertools import chain, combinations
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.compute as pc
 
 # ── Configuration ──────────────────────────────────────────────────────────────
 
@@ -30,28 +40,195 @@ logging.basicConfig(
 )
 log = logging.getLogger("epstein_processor")
 
+# Text that int() accepts for a count column (surrounding whitespace and
+# single underscores between digits allowed)
+INT_PATTERN = r"^\s*[+-]?\d(?:_?\d)*\s*$"
+# The same count once normalized, capped at 18 digits so it fits in int64
+INT64_PATTERN = r"^-?\d{1,18}$"
+
+# First 19xx/20xx year in a date string
+YEAR_RE = re.compile(r"(19|20)\d{2}")
+YEAR_PATTERN = r"(?P<year>(?:19|20)\d{2})"   # same, for Arrow's extract_regex
+
+# Passenger list separators, all folded to "," so one str.split suffices
+PAX_SEPARATORS = str.maketrans(";/&", ",,,")
+
 
 def ensure_dirs():
     DASHBOARD_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def files_by_suffix(folder):
+    """{suffix: [Path, ...]} for the files in `folder`, from a single scandir pass."""
+    by_suffix = defaultdict(list)
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file():
+                    by_suffix[os.path.splitext(entry.name)[1]].append(Path(entry.path))
+    except FileNotFoundError:
+        pass
+    return by_suffix
+
+
 def read_csv_safe(filepath):
-    """Read a CSV file with error handling."""
+    """
+    Read a CSV file into a pyarrow Table with every column as string
+    (only empty cells become null, so text like "NA" survives as it does with
+    csv.DictReader, and a repeated header name keeps its last column). Falls back to the csv module for files Arrow
+    rejects, e.g. invalid UTF-8. Returns an empty table on error.
+    """
     try:
-        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+        # utf-8-sig: Arrow drops a leading BOM, so the names must match without it
+        with open(filepath, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+            header = next(csv.reader(f), [])
+        read_options = pv.ReadOptions(block_size=8 << 20)
+        last = {name: i for i, name in enumerate(header)}
+        if len(last) < len(header):
+            # Repeated header name: DictReader keeps the last one, so rename the others
+            header = [name if last[name] == i else f"{name}#{i}" for i, name in enumerate(header)]
+            read_options = pv.ReadOptions(block_size=8 << 20, column_names=header, skip_rows=1)
+        return pv.read_csv(
+            filepath,
+            read_options=read_options,
+            convert_options=pv.ConvertOptions(
+                column_types={name: pa.string() for name in header},
+                null_values=[""],
+                strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid:
+        try:
+            with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+                return pa.Table.from_pylist(list(csv.DictReader(f)))
+        except Exception as e:
+            log.error(f"Error reading {filepath}: {e}")
     except Exception as e:
         log.error(f"Error reading {filepath}: {e}")
-        return []
-
-
+    return pa.table({})
+
+
+def col(table, *names):
+    """Values of the first of `names` present in the table, or all-None if none are."""
+    for name in names:
+        if name in table.column_names:
+            return table.column(name).to_pylist()
+    return [None] * table.num_rows
+
+
+def iter_rows(table):
+    """Yield the table's rows as dicts one record batch at a time, never the whole list."""
+    for batch in table.to_batches():
+        yield from batch.to_pylist()
+
+
+def int_col(table, *names, default=0):
+    """Like col(), cast to int in one pass; blanks and non-integer text become `default`."""
+    for name in names:
+        if name in table.column_names:
+            values = table.column(name)
+            if not pa.types.is_string(values.type):   # e.g. a type Arrow inferred itself
+                values = pc.cast(values, pa.string())
+            is_int = pc.match_substring_regex(values, INT_PATTERN)
+            values = pc.utf8_trim_whitespace(pc.if_else(is_int, values, None))
+            values = pc.replace_substring_regex(values, r"^\+|_", "")   # cast rejects "+5", "1_000"
+            values = pc.if_else(pc.match_substring_regex(values, INT64_PATTERN), values, None)
+            return pc.fill_null(pc.cast(values, pa.int64()), default).to_pylist()
+    return [default] * table.num_rows
+
+
+def text_col(table, *names):
+    """
+    Whitespace-trimmed string column as an Arrow array: per row, the first
+    non-blank value among `names` ('' if all are blank or missing).
+    """
+    values = [table.column(name) for name in names if name in table.column_names]
+    if not values:
+        return pa.array([""] * table.num_rows, pa.string())
+    values = [pc.if_else(pc.equal(v, ""), None, v) for v in values]
+    return pc.utf8_trim_whitespace(pc.fill_null(pc.coalesce(*values), ""))
+
+
+def year_col(table, name):
+    """First 19xx/20xx year in each value of a column, extracted in one pass ('' if none)."""
+    if name not in table.column_names:
+        return pa.array([""] * table.num_rows, pa.string())
+    years = pc.struct_field(pc.extract_regex(table.column(name), YEAR_PATTERN), "year")
+    return pc.fill_null(years, "")
+
+
+def airport_label(name, code):
+    """'Name (CODE)' when both are present, else whichever one is (vectorized)."""
+    both = pc.and_(pc.not_equal(name, ""), pc.not_equal(code, ""))
+    labelled = pc.binary_join_element_wise(name, " (", code, ")", "")
+    return pc.if_else(both, labelled, pc.if_else(pc.not_equal(name, ""), name, code))
+
+
+def top_counts(values, k=None):
+    """(value, count) for the non-empty values, most common first — like Counter.most_common, counted by Arrow."""
+    arr = pa.array(values, type=pa.string())
+    counts = pc.value_counts(arr.filter(pc.not_equal(arr, "")))
+    # Stable sort: ties keep first-seen order, as most_common does
+    order = pc.array_sort_indices(counts.field("counts"), order="descending")
+    top = counts.take(order if k is None else order[:k])
+    return list(zip(top.field("values").to_pylist(), top.field("counts").to_pylist()))
+
+
+def sort_records(records, keys, order="descending", default=0):
+    """Stable multi-key sort of dicts: keys go to Arrow columns, one C++ sort_indices call."""
+    if len(records) < 2:
+        return records
+    key_table = pa.table({k: [r.get(k, default) for r in records] for k in keys})
+    indices = pc.sort_indices(key_table, sort_keys=[(k, order) for k in keys])
+    return [records[i] for i in indices.to_pylist()]
+
+
+@lru_cache(maxsize=1)
 def load_image_index():
+    """Parse image_index.json once; orjson reads the mapped bytes without a str copy."""
     index_path = DATA_DIR / "processed" / "image_index.json"
-    if index_path.exists():
-        with open(index_path, "r") as f:
-            return json.load(f)
-    return {}
+    if not index_path.exists() or index_path.stat().st_size == 0:
+        return {}
+    with open(index_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+@lru_cache(maxsize=None)
+def title_case(name):
+    """Memoized str.title() — the same names recur across sources."""
+    return name.title()
+
+
+@lru_cache(maxsize=None)
+def lower_case(name):
+    """Memoized str.lower() for name-keyed joins across sources."""
+    return name.lower()
+
+
+def build_token_index(image_index):
+    """Map each word of an image-index key to the keys containing it, in index order."""
+    token_index = defaultdict(list)
+    for key in image_index:
+        for token in dict.fromkeys(key.split()):
+            token_index[token].append(key)
+    return token_index
+
+
+def match_images(name_title, image_index, token_index):
+    """Images for a name: exact key match, else the first key containing its first two name words."""
+    images = image_index.get(name_title, [])
+    if images:
+        return images
+    name_parts = name_title.split()
+    parts = [part for part in name_parts[:2] if len(part) > 2]
+    if len(name_parts) < 2 or not parts:
+        return []
+    others = [set(token_index.get(part, ())) for part in parts[1:]]
+    for key in token_index.get(parts[0], ()):
+        if all(key in other for other in others):
+            return image_index[key]
+    return []
 
 
 # ── Processing Functions ───────────────────────────────────────────────────────
@@ -66,43 +243,27 @@ def process_entities(image_index):
         log.warning("   ⚠️ entities.csv not found")
         return None
 
-    records = read_csv_safe(filepath)
-    log.info(f"   📄 entities.csv: {len(records)} records")
+    table = read_csv_safe(filepath)
+    log.info(f"   📄 entities.csv: {table.num_rows} records")
+
+    token_index = build_token_index(image_index)
 
     processed = []
-    for record in records:
-        name = (record.get("name", "") or "").strip()
+    for name, entity_type, role, doc_count, flight_count, email_count, slug in zip(
+        col(table, "name"), col(table, "entity_type"), col(table, "role_description"),
+        int_col(table, "document_count"), int_col(table, "flight_count"), int_col(table, "email_count"),
+        col(table, "slug"),
+    ):
+        name = (name or "").strip()
         if not name:
             continue
 
-        entity_type = (record.get("entity_type", "") or "").strip()
-        role = (record.get("role_description", "") or "").strip()
-        doc_count = 0
-        flight_count = 0
-        email_count = 0
-
-        try:
-            doc_count = int(record.get("document_count", 0) or 0)
-        except (ValueError, TypeError):
-            pass
-        try:
-            flight_count = int(record.get("flight_count", 0) or 0)
-        except (ValueError, TypeError):
-            pass
-        try:
-            email_count = int(record.get("email_count", 0) or 0)
-        except (ValueError, TypeError):
-            pass
+        # Low-cardinality label: intern so every row shares one str object
+        entity_type = sys.intern((entity_type or "").strip())
+        role = (role or "").strip()
 
         # Match images
-        name_title = name.title()
-        images = image_index.get(name_title, [])
-        if not images:
-            for key in image_index:
-                name_parts = name_title.split()
-                if len(name_parts) >= 2 and all(part in key for part in name_parts[:2] if len(part) > 2):
-                    images = image_index[key]
-                    break
+        images = match_images(title_case(name), image_index, token_index)
 
         entry = {
             "name": name,
@@ -111,12 +272,12 @@ def process_entities(image_index):
             "documents": doc_count,
             "flights": flight_count,
             "emails": email_count,
-            "slug": (record.get("slug", "") or "").strip(),
+            "slug": (slug or "").strip(),
             "images": images,
         }
         processed.append(entry)
 
-    processed.sort(key=lambda x: (x["flights"], x["documents"]), reverse=True)
+    processed = sort_records(processed, ("flights", "documents"))
     log.info(f"   ✅ Processed {len(processed)} entities")
     return processed
 
@@ -125,7 +286,7 @@ def process_persons_kaggle(image_index):
     """Process Kaggle Persons of Interest dataset (supplement)."""
     # Look for any non-entities CSV in persons_of_interest/
     folder = DATA_DIR / "persons_of_interest"
-    csv_files = [f for f in folder.glob("*.csv") if f.name != "entities.csv"]
+    csv_files = [f for f in files_by_suffix(folder)[".csv"] if f.name != "entities.csv"]
 
     if not csv_files:
         return None
@@ -133,43 +294,32 @@ def process_persons_kaggle(image_index):
     log.info("👤 Processing Kaggle Persons of Interest (supplement)...")
     all_records = []
     for csv_file in csv_files:
-        records = read_csv_safe(csv_file)
-        log.info(f"   📄 {csv_file.name}: {len(records)} records")
-        all_records.extend(records)
+        table = read_csv_safe(csv_file)
+        log.info(f"   📄 {csv_file.name}: {table.num_rows} records")
+        all_records.extend(zip(
+            # Support both field naming conventions
+            col(table, "Name"), col(table, "Persons of Interest"),
+            # Kaggle CSV uses 'Flights'/'Documents', older format used 'Number of ...'
+            int_col(table, "Flights", "Number of flights"),
+            int_col(table, "Documents", "Number of documents"),
+            int_col(table, "Connections"), col(table, "Bio"), col(table, "In Black Book"),
+            col(table, "Nationality"), col(table, "Category"),
+        ))
 
     processed = []
-    for record in all_records:
-        # Support both field naming conventions
-        name = (record.get("Name", "") or record.get("Persons of Interest", "") or "").strip()
+    for (name, alt_name, flights, documents, connections,
+         bio, black_book, nationality, category) in all_records:
+        name = (name or alt_name or "").strip()
         if not name:
             continue
 
-        flights = 0
-        documents = 0
-        connections = 0
-        bio = ""
-        try:
-            # Kaggle CSV uses 'Flights', older format used 'Number of flights'
-            flights = int(record.get("Flights", record.get("Number of flights", 0)) or 0)
-        except (ValueError, TypeError):
-            pass
-        try:
-            # Kaggle CSV uses 'Documents', older format used 'Number of documents'
-            documents = int(record.get("Documents", record.get("Number of documents", 0)) or 0)
-        except (ValueError, TypeError):
-            pass
-        try:
-            connections = int(record.get("Connections", 0) or 0)
-        except (ValueError, TypeError):
-            pass
-
-        bio = (record.get("Bio", "") or "").strip()
-        in_bb = (record.get("In Black Book", "") or "").strip().lower() in ("yes", "true", "1", "y")
-        nationality = (record.get("Nationality", "") or "").strip() or "Unknown"
+        bio = (bio or "").strip()
+        in_bb = (black_book or "").strip().lower() in ("yes", "true", "1", "y")
+        nationality = sys.intern((nationality or "").strip() or "Unknown")
+        category = sys.intern((category or "").strip() or "Unknown")
 
         # Match images
-        name_title = name.title()
-        images = image_index.get(name_title, [])
+        images = image_index.get(title_case(name), [])
 
         processed.append({
             "name": name,
@@ -179,11 +329,11 @@ def process_persons_kaggle(image_index):
             "connections": connections,
             "in_black_book": in_bb,
             "nationality": nationality,
-            "category": (record.get("Category", "") or "").strip() or "Unknown",
+            "category": category,
             "images": images,
         })
 
-    processed.sort(key=lambda x: (x["connections"], x["flights"], x["documents"]), reverse=True)
+    processed = sort_records(processed, ("connections", "flights", "documents"))
     log.info(f"   ✅ Processed {len(processed)} kaggle persons")
     return processed
 
@@ -194,11 +344,8 @@ def count_connections_from_relationships(relationships_data):
     if not relationships_data:
         return conn_counts
     rel_links, _ = relationships_data
-    for link in rel_links:
-        src = link["source"]
-        tgt = link["target"]
-        conn_counts[src] += 1
-        conn_counts[tgt] += 1
+    # One C-level counting pass over every endpoint
+    conn_counts.update(chain.from_iterable((link["source"], link["target"]) for link in rel_links))
     return conn_counts
 
 
@@ -215,10 +362,9 @@ def merge_persons(entities_data, kaggle_data, connection_counts=None):
         return []
 
     if not kaggle_data:
-        # Convert entities to persons format
-        persons = []
-        for e in entities_data:
-            persons.append({
+        # Convert entities to persons format (one record per entity, so the comprehension sizes the list)
+        return [
+            {
                 "name": e["name"],
                 "entity_type": e.get("entity_type", ""),
                 "role_description": e.get("role_description", ""),
@@ -231,18 +377,21 @@ def merge_persons(entities_data, kaggle_data, connection_counts=None):
                 "category": e.get("entity_type", "Unknown"),
                 "slug": e.get("slug", ""),
                 "images": e.get("images", []),
-            })
-        return persons
+            }
+            for e in entities_data
+        ]
 
     # Merge: entities as base, enrich with Kaggle data
-    kaggle_map = {p["name"].lower(): p for p in kaggle_data}
+    # Case-fold each Kaggle name once; the keys serve both the join and the seen check
+    kaggle_keys = [lower_case(p["name"]) for p in kaggle_data]
+    kaggle_lower = dict(zip(kaggle_keys, kaggle_data))
     merged = []
     seen = set()
 
     for e in entities_data:
-        name_lower = e["name"].lower()
+        name_lower = lower_case(e["name"])
         seen.add(name_lower)
-        kaggle_match = kaggle_map.get(name_lower, {})
+        kaggle_match = kaggle_lower.get(name_lower, {})
         conn = max(connection_counts.get(e["name"], 0), kaggle_match.get("connections", 0))
 
         merged.append({
@@ -261,13 +410,12 @@ def merge_persons(entities_data, kaggle_data, connection_counts=None):
         })
 
     # Add Kaggle-only entries
-    for p in kaggle_data:
-        if p["name"].lower() not in seen:
+    for lname, p in zip(kaggle_keys, kaggle_data):
+        if lname not in seen:
             p["connections"] = max(p.get("connections", 0), connection_counts.get(p["name"], 0))
             merged.append(p)
 
-    merged.sort(key=lambda x: (x.get("flights", 0), x.get("documents", 0)), reverse=True)
-    return merged
+    return sort_records(merged, ("flights", "documents"))
 
 
 def process_flights():
@@ -279,52 +427,30 @@ def process_flights():
         log.warning("   ⚠️ flights.csv not found")
         return None
 
-    records = read_csv_safe(filepath)
-    log.info(f"   📄 flights.csv: {len(records)} records")
-
-    processed = []
-    for record in records:
-        date = (record.get("flight_date", "") or "").strip()
-        aircraft = (record.get("aircraft_tail_number", "") or record.get("aircraft_id", "") or "").strip()
-        pilot = (record.get("pilot_name", "") or record.get("pilot", "") or "").strip()
-        dep_code = (record.get("departure_airport_code", "") or "").strip()
-        dep_name = (record.get("departure_airport", "") or "").strip()
-        arr_code = (record.get("arrival_airport_code", "") or "").strip()
-        arr_name = (record.get("arrival_airport", "") or "").strip()
-
-        # Passengers — may be a list or comma-separated
-        pax_raw = record.get("passenger_names", "") or ""
-        if isinstance(pax_raw, str):
-            pax_raw = pax_raw.strip().strip("[]\"'")
-            passengers = pax_raw
-        else:
-            passengers = str(pax_raw)
-
-        # Construct display strings
-        departure = f"{dep_name} ({dep_code})" if dep_code and dep_name else (dep_name or dep_code or "")
-        arrival = f"{arr_name} ({arr_code})" if arr_code and arr_name else (arr_name or arr_code or "")
-
-        # Parse year
-        year = ""
-        if date:
-            ym = re.search(r"(19|20)\d{2}", date)
-            if ym:
-                year = ym.group()
-
-        entry = {
-            "date": date,
-            "year": year,
-            "departure": departure,
-            "departure_code": dep_code,
-            "arrival": arrival,
-            "arrival_code": arr_code,
-            "aircraft": aircraft,
-            "pilot": pilot,
-            "passengers": passengers,
-        }
-        processed.append(entry)
-
-    processed.sort(key=lambda x: x.get("date", ""))
+    table = read_csv_safe(filepath)
+    log.info(f"   📄 flights.csv: {table.num_rows} records")
+
+    # Clean whole columns at once, then build the row dicts in one step
+    date = text_col(table, "flight_date")
+    dep_code = text_col(table, "departure_airport_code")
+    dep_name = text_col(table, "departure_airport")
+    arr_code = text_col(table, "arrival_airport_code")
+    arr_name = text_col(table, "arrival_airport")
+    # Passengers — strip list brackets/quotes left over from export
+    passengers = pc.utf8_trim(text_col(table, "passenger_names"), characters="[]\"'")
+
+    flights = pa.table({
+        "date": date,
+        "year": year_col(table, "flight_date"),
+        "departure": airport_label(dep_name, dep_code),
+        "departure_code": dep_code,
+        "arrival": airport_label(arr_name, arr_code),
+        "arrival_code": arr_code,
+        "aircraft": text_col(table, "aircraft_tail_number", "aircraft_id"),
+        "pilot": text_col(table, "pilot_name", "pilot"),
+        "passengers": passengers,
+    })
+    processed = flights.take(pc.sort_indices(date)).to_pylist()
     log.info(f"   ✅ Processed {len(processed)} flight records")
     return processed
 
@@ -338,24 +464,27 @@ def process_relationships():
         log.warning("   ⚠️ relationships.csv not found")
         return None
 
-    records = read_csv_safe(filepath)
-    log.info(f"   📄 relationships.csv: {len(records)} records")
+    table = read_csv_safe(filepath)
+    log.info(f"   📄 relationships.csv: {table.num_rows} records")
 
     links = []
     node_set = set()
 
-    for record in records:
-        entity_a = (record.get("entity_a", "") or "").strip()
-        entity_b = (record.get("entity_b", "") or "").strip()
-        rel_type = (record.get("relationship_type", "") or "").strip()
+    for entity_a, entity_b, rel_type, raw_strength in zip(
+        col(table, "entity_a"), col(table, "entity_b"),
+        col(table, "relationship_type"), col(table, "strength"),
+    ):
+        entity_a = (entity_a or "").strip()
+        entity_b = (entity_b or "").strip()
+        rel_type = (rel_type or "").strip()
         strength = 1
         try:
-            strength = int(record.get("strength", 1) or 1)
+            strength = int(raw_strength or 1)
         except (ValueError, TypeError):
             try:
-                strength = float(record.get("strength", 1) or 1)
+                strength = float(raw_strength or 1)
                 strength = int(round(strength))
-            except:
+            except (ValueError, TypeError):
                 strength = 1
 
         if entity_a and entity_b:
@@ -374,35 +503,36 @@ def process_relationships():
 
 def process_documents():
     """Process document metadata from Kaggle ranked dataset (JSONL or CSV)."""
-    import json as _json
     log.info("📄 Processing Document Metadata...")
 
     folder = DATA_DIR / "documents"
+    files = files_by_suffix(folder)
     all_records = []
 
     # Load JSONL files (primary: Kaggle ranked dataset)
-    jsonl_files = sorted(folder.glob("*.jsonl"))
+    jsonl_files = sorted(files[".jsonl"])
     if jsonl_files:
         log.info(f"   Found {len(jsonl_files)} JSONL file(s)")
         for jf in jsonl_files:
             try:
-                with open(jf, encoding="utf-8") as f:
+                # orjson parses the raw bytes directly; 1 MiB read buffer
+                with open(jf, "rb", buffering=1 << 20) as f:
                     for line in f:
-                        line = line.strip()
-                        if line:
-                            all_records.append(_json.loads(line))
+                        if not line.isspace():
+                            all_records.append(orjson.loads(line))
             except Exception as e:
                 log.warning(f"   ⚠️ Could not read {jf.name}: {e}")
         log.info(f"   📄 Loaded {len(all_records)} JSONL records")
 
-    # Load CSV files as fallback
-    csv_files = list(folder.glob("*.csv"))
+    # Load CSV files as fallback; rows are converted lazily, batch by batch
+    csv_files = files[".csv"]
+    csv_tables = []
     for csv_file in csv_files:
-        records = read_csv_safe(csv_file)
-        log.info(f"   📄 {csv_file.name}: {len(records)} records")
-        all_records.extend(records)
+        table = read_csv_safe(csv_file)
+        log.info(f"   📄 {csv_file.name}: {table.num_rows} records")
+        csv_tables.append(table)
 
-    if not all_records:
+    if not all_records and not any(t.num_rows for t in csv_tables):
         log.warning("   ⚠️ No document files found in data/documents/")
         return None
 
@@ -415,7 +545,7 @@ def process_documents():
         return [x.strip().strip("'\"") for x in val.split(",") if x.strip()]
 
     processed = []
-    for record in all_records:
+    for record in chain(all_records, *map(iter_rows, csv_tables)):
         filename = (record.get("filename", "") or record.get("Filename", "") or "").strip()
         headline = (record.get("headline", "") or record.get("title", "") or "").strip()
         if not filename and not headline:
@@ -442,7 +572,7 @@ def process_documents():
         }
         processed.append(entry)
 
-    processed.sort(key=lambda x: x["importance_score"], reverse=True)
+    processed = sort_records(processed, ("importance_score",))
     log.info(f"   ✅ Processed {len(processed)} documents")
     return processed
 
@@ -456,22 +586,25 @@ def process_emails():
         log.warning("   ⚠️ emails.csv not found")
         return None
 
-    records = read_csv_safe(filepath)
-    log.info(f"   📄 emails.csv: {len(records)} records")
+    table = read_csv_safe(filepath)
+    log.info(f"   📄 emails.csv: {table.num_rows} records")
 
     processed = []
-    for record in records:
+    for date, sender, recipient, subject, slug in zip(
+        col(table, "date"), col(table, "from"), col(table, "to"),
+        col(table, "subject"), col(table, "slug"),
+    ):
         entry = {
-            "date": (record.get("date", "") or "").strip(),
-            "from": (record.get("from", "") or "").strip(),
-            "to": (record.get("to", "") or "").strip(),
-            "subject": (record.get("subject", "") or "").strip(),
-            "slug": (record.get("slug", "") or "").strip(),
+            "date": (date or "").strip(),
+            "from": (sender or "").strip(),
+            "to": (recipient or "").strip(),
+            "subject": (subject or "").strip(),
+            "slug": (slug or "").strip(),
         }
         if entry["from"] or entry["to"]:
             processed.append(entry)
 
-    processed.sort(key=lambda x: x.get("date", ""))
+    processed = sort_records(processed, ("date",), order="ascending", default="")
     log.info(f"   ✅ Processed {len(processed)} emails")
     return processed
 
@@ -523,19 +656,18 @@ def build_network(persons_data, relationships_data, flight_data):
         for flight in flight_data:
             pax_str = flight.get("passengers", "")
             if pax_str:
-                pax = re.split(r"[,;/&]+", pax_str)
-                pax = [p.strip().title() for p in pax if p.strip() and len(p.strip()) > 2]
-                for i, p1 in enumerate(pax):
-                    for p2 in pax[i + 1:]:
-                        if p1 != p2:
-                            pair = tuple(sorted([p1, p2]))
-                            co_occurrence[pair] += 1
-                            for p in [p1, p2]:
-                                if p not in nodes:
-                                    nodes[p] = {
-                                        "id": p, "group": "Flight Passenger",
-                                        "flights": 0, "documents": 0, "connections": 0,
-                                    }
+                pax = pax_str.translate(PAX_SEPARATORS).split(",")
+                # Distinct passengers, in order of appearance
+                pax = list(dict.fromkeys(p.strip().title() for p in pax if len(p.strip()) > 2))
+                if len(pax) < 2:
+                    continue
+                co_occurrence.update((a, b) if a < b else (b, a) for a, b in combinations(pax, 2))
+                for p in pax:
+                    if p not in nodes:
+                        nodes[p] = {
+                            "id": p, "group": "Flight Passenger",
+                            "flights": 0, "documents": 0, "connections": 0,
+                        }
 
         for (src, tgt), weight in co_occurrence.most_common(500):
             links.append({"source": src, "target": tgt, "weight": weight, "type": "co-passenger"})
@@ -573,35 +705,42 @@ def generate_summary(persons_data, flight_data, document_data, email_data, image
             "in_black_book": black_book_count,
             "top_by_flights": [
                 {"name": p["name"], "flights": p["flights"]}
-                for p in sorted(persons_data, key=lambda x: x.get("flights", 0), reverse=True)[:15]
+                for p in nlargest(15, persons_data, key=lambda x: x.get("flights", 0))
                 if p.get("flights", 0) > 0
             ],
             "top_by_connections": [
                 {"name": p["name"], "connections": p.get("connections", p.get("documents", 0))}
-                for p in sorted(persons_data, key=lambda x: x.get("connections", x.get("documents", 0)), reverse=True)[:15]
+                for p in nlargest(15, persons_data, key=lambda x: x.get("connections", x.get("documents", 0)))
             ],
         }
 
     # Flight stats
     if flight_data:
-        years = Counter(f["year"] for f in flight_data if f.get("year"))
-        departures = Counter(f["departure"] for f in flight_data if f.get("departure"))
-        arrivals = Counter(f["arrival"] for f in flight_data if f.get("arrival"))
-        aircraft = Counter(f["aircraft"] for f in flight_data if f.get("aircraft"))
-
-        routes = Counter()
-        for f in flight_data:
-            dep = f.get("departure", "").strip()
-            arr = f.get("arrival", "").strip()
-            if dep and arr:
-                routes[(dep, arr)] += 1
+        departures = [f.get("departure") for f in flight_data]
+        arrivals = [f.get("arrival") for f in flight_data]
+
+        # Routes: count (from, to) groups; ties broken by first appearance, as most_common does
+        legs = pa.table({
+            "from": pc.utf8_trim_whitespace(pa.array(departures, type=pa.string())),
+            "to": pc.utf8_trim_whitespace(pa.array(arrivals, type=pa.string())),
+            "row": pa.array(range(len(flight_data)), type=pa.int64()),
+        })
+        legs = legs.filter(pc.and_(pc.not_equal(legs["from"], ""), pc.not_equal(legs["to"], "")))
+        routes = (
+            legs.group_by(["from", "to"])
+            .aggregate([([], "count_all"), ("row", "min")])
+            .sort_by([("count_all", "descending"), ("row_min", "ascending")])
+            .slice(0, 20)
+        )
 
         summary["flight_stats"] = {
-            "by_year": dict(sorted(years.items())),
-            "top_departures": dict(departures.most_common(15)),
-            "top_arrivals": dict(arrivals.most_common(15)),
-            "top_routes": [{"from": r[0], "to": r[1], "count": c} for r, c in routes.most_common(20)],
-            "aircraft_types": dict(aircraft.most_common(10)),
+            "by_year": dict(sorted(top_counts([f.get("year") for f in flight_data]))),
+            "top_departures": dict(top_counts(departures, 15)),
+            "top_arrivals": dict(top_counts(arrivals, 15)),
+            "top_routes": [
+                {"from": r["from"], "to": r["to"], "count": r["count_all"]} for r in routes.to_pylist()
+            ],
+            "aircraft_types": dict(top_counts([f.get("aircraft") for f in flight_data], 10)),
         }
 
     # Document stats
@@ -610,20 +749,17 @@ def generate_summary(persons_data, flight_data, document_data, email_data, image
         all_power = Counter()
         all_agencies = Counter()
         all_leads = Counter()
-        importance_dist = Counter()
 
+        # One pass over the documents; Counter.update counts each list in C
         for doc in document_data:
-            for t in doc.get("tags", []):
-                if t: all_tags[t] += 1
-            for p in doc.get("power_mentions", []):
-                if p: all_power[p] += 1
-            for a in doc.get("agency_involvement", []):
-                if a: all_agencies[a] += 1
-            for l in doc.get("lead_types", []):
-                if l: all_leads[l] += 1
-            score = doc.get("importance_score", 0)
-            bucket = f"{(score // 10) * 10}-{(score // 10) * 10 + 9}"
-            importance_dist[bucket] += 1
+            all_tags.update(filter(None, doc.get("tags", [])))
+            all_power.update(filter(None, doc.get("power_mentions", [])))
+            all_agencies.update(filter(None, doc.get("agency_involvement", [])))
+            all_leads.update(filter(None, doc.get("lead_types", [])))
+
+        # Count by decile first, build the "40-49" style labels once per bucket
+        deciles = Counter(doc.get("importance_score", 0) // 10 for doc in document_data)
+        importance_dist = {f"{d * 10}-{d * 10 + 9}": n for d, n in deciles.items()}
 
         summary["document_stats"] = {
             "top_tags": dict(all_tags.most_common(30)),
@@ -636,17 +772,13 @@ def generate_summary(persons_data, flight_data, document_data, email_data, image
 
     # Email stats
     if email_data:
-        senders = Counter(e["from"] for e in email_data if e.get("from"))
-        recipients = Counter(e["to"] for e in email_data if e.get("to"))
-        email_years = Counter()
-        for e in email_data:
-            ym = re.search(r"(19|20)\d{2}", e.get("date", ""))
-            if ym:
-                email_years[ym.group()] += 1
+        email_years = Counter(
+            ym.group() for ym in map(YEAR_RE.search, (e.get("date", "") for e in email_data)) if ym
+        )
 
         summary["email_stats"] = {
-            "top_senders": dict(senders.most_common(15)),
-            "top_recipients": dict(recipients.most_common(15)),
+            "top_senders": dict(top_counts([e.get("from") for e in email_data], 15)),
+            "top_recipients": dict(top_counts([e.get("to") for e in email_data], 15)),
             "by_year": dict(sorted(email_years.items())),
         }
 
@@ -665,13 +797,21 @@ def main():
     image_index = load_image_index()
     log.info(f"📷 Image index: {len(image_index)} entries\n")
 
-    # Process each source
-    entities_data = process_entities(image_index)
-    kaggle_data = process_persons_kaggle(image_index)
-    flight_data = process_flights()
-    relationships_data = process_relationships()
-    document_data = process_documents()
-    email_data = process_emails()
+    # Process each source — they read disjoint files, so run them concurrently
+    # (Arrow's CSV parser releases the GIL)
+    with ThreadPoolExecutor(max_workers=6) as ex:
+        entities_future = ex.submit(process_entities, image_index)
+        kaggle_future = ex.submit(process_persons_kaggle, image_index)
+        flight_future = ex.submit(process_flights)
+        relationships_future = ex.submit(process_relationships)
+        document_future = ex.submit(process_documents)
+        email_future = ex.submit(process_emails)
+    entities_data = entities_future.result()
+    kaggle_data = kaggle_future.result()
+    flight_data = flight_future.result()
+    relationships_data = relationships_future.result()
+    document_data = document_future.result()
+    email_data = email_future.result()
 
     # Count connections from relationships
     connection_counts = count_connections_from_relationships(relationships_data)
@@ -697,21 +837,23 @@ def main():
         "summary.json": summary_data,
     }
 
+    # orjson encodes straight to UTF-8 bytes — no intermediate str
+    json_opts = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
     for filename, data in exports.items():
         filepath = DASHBOARD_DATA_DIR / filename
         if data:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(filepath, "wb") as f:
+                f.write(orjson.dumps(data, option=json_opts))
             size_kb = filepath.stat().st_size / 1024
             log.info(f"   ✅ {filename} ({size_kb:.1f} KB)")
         else:
-            with open(filepath, "w") as f:
+            with open(filepath, "wb") as f:
                 if "network" in filename:
-                    json.dump({"nodes": [], "links": []}, f)
+                    f.write(orjson.dumps({"nodes": [], "links": []}))
                 elif "summary" in filename:
-                    json.dump(summary_data or {}, f, indent=2)
+                    f.write(orjson.dumps(summary_data or {}, option=json_opts))
                 else:
-                    json.dump([], f)
+                    f.write(orjson.dumps([]))
             log.info(f"   ⚠️ {filename} (empty — source data not available)")
 
     log.info("\n" + "=" * 60)
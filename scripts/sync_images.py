@@ -14,12 +14,21 @@ Usage:
 """
 
 import os
-import json
+import re
+import mmap
+import hashlib
+import errno
+import orjson
 import time
 import shutil
+import uuid
+import sqlite3
+import asyncio
 import logging
-import requests
+import httpx
 from pathlib import Path
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
@@ -34,6 +43,23 @@ GDRIVE_DIR       = PERSONS_DIR / "GDrive_Upload"     # where Kaggle unzipped
 
 POI_JSON         = BASE_DIR / "dashboard" / "data" / "persons_of_interest.json"
 IMAGE_INDEX_OUT  = DATA_DIR / "processed" / "image_index.json"
+WIKI_CACHE       = DATA_DIR / "processed" / "wiki_cache.sqlite"   # lookup results across runs
+IMAGE_HASHES     = DATA_DIR / "processed" / "image_hashes.json"   # content hash → first saved copy
+IMAGE_MANIFEST   = DATA_DIR / "processed" / "image_manifest.json" # per-folder listing, keyed by mtime
+NEGATIVE_TTL     = 30 * 24 * 3600   # re-check "no image" lookups after 30 days
+
+WIKI_API         = "https://en.wikipedia.org/w/api.php"
+USER_AGENT       = "EpsteinFilesDashboard/1.0 (research; educational)"
+WIKI_CONCURRENCY = 8      # persons fetched at once
+WIKI_BATCH_SIZE  = 50     # MediaWiki's titles= limit for regular clients
+MAX_THUMB_BYTES  = 2_000_000   # refuse anything bigger than a sane 400 px thumbnail
+THUMB_CHUNK      = 64 * 1024   # streaming chunk size → peak memory ≈ concurrency × chunk
+# Polite per-host request rates (requests/second, token bucket); other hosts get DEFAULT_RATE
+HOST_RATES       = {"en.wikipedia.org": 10, "upload.wikimedia.org": 20}
+DEFAULT_RATE     = 10
+
+IMAGE_EXTS       = frozenset((".jpg", ".jpeg", ".png", ".gif", ".webp"))
+STAT_WORKERS     = 16     # parallel stat() calls while indexing
 
 # Known victims with their best Wikipedia search term
 # (Wikipedia often has no photo for victims for privacy, so we note what to try)
@@ -53,6 +79,21 @@ VICTIM_SEARCH_TERMS = {
 # Set of lowercase name prefixes that flag someone as a victim
 VICTIM_NAMES = set(VICTIM_SEARCH_TERMS.keys())
 
+# is_victim matchers, compiled once: any victim name / bio keyword as a substring
+VICTIM_NAME_RE = re.compile("|".join(map(re.escape, VICTIM_NAMES)))
+VICTIM_BIO_RE = re.compile("victim|accuser|trafficked|survivor|abuse")
+VICTIM_CATEGORIES = frozenset(("victim", "accuser", "survivor"))
+
+# Victim name → alternate Wikipedia search term, as one regex with a named group per key
+VICTIM_ALT_TERMS = {f"k{i}": alt for i, alt in enumerate(VICTIM_SEARCH_TERMS.values()) if alt}
+VICTIM_ALT_RE = re.compile("|".join(
+    f"(?P<k{i}>{re.escape(key)})" for i, (key, alt) in enumerate(VICTIM_SEARCH_TERMS.items()) if alt
+))
+
+# safe_filename: space → "_", every other ASCII non-alphanumeric except "_" dropped, in one pass
+FILENAME_TABLE = {i: None for i in range(128) if not chr(i).isalnum() and chr(i) != "_"}
+FILENAME_TABLE[ord(" ")] = "_"
+
 # ── Logging ───────────────────────────────────────────────────────────────────
 
 logging.basicConfig(
@@ -61,84 +102,259 @@ logging.basicConfig(
     datefmt="%H:%M:%S",
 )
 log = logging.getLogger("image_sync")
+logging.getLogger("httpx").setLevel(logging.WARNING)   # no per-request INFO lines
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 def is_victim(name: str, category: str, bio: str = "") -> bool:
     """Determine if a person is classified as a victim."""
-    name_lower = name.lower()
-    if any(v in name_lower for v in VICTIM_NAMES):
+    if VICTIM_NAME_RE.search(name.lower()):
         return True
     # Check bio for victim-related keywords
-    bio_lower = (bio or "").lower()
-    if any(kw in bio_lower for kw in ("victim", "accuser", "trafficked", "survivor", "abuse")):
+    if bio and VICTIM_BIO_RE.search(bio.lower()):
         return True
     # category 'victim' or 'accuser' if it ever appears
-    if category and category.lower() in ("victim", "accuser", "survivor"):
-        return True
-    return False
+    return bool(category) and category.lower() in VICTIM_CATEGORIES
 
 
 def safe_filename(name: str, ext: str = ".jpg") -> str:
     """Convert a name to a safe filename."""
-    safe = name.lower().replace(" ", "_").replace("'", "").replace(".", "")
-    safe = "".join(c for c in safe if c.isalnum() or c == "_")
+    safe = name.lower().translate(FILENAME_TABLE)
+    if not safe.isascii():
+        # Rare: keep Unicode letters/digits, drop other non-ASCII symbols
+        safe = "".join(c for c in safe if c.isalnum() or c == "_")
     return safe + ext
 
 
-def fetch_wikipedia_image(name: str, session: requests.Session, alt_name: str = None) -> bytes | None:
+def normalize_name_key(stem: str) -> str:
+    """Image file stem → image-index name key ('bill_gates' → 'Bill Gates')."""
+    return stem.replace("_", " ").replace("-", " ").strip().title()
+
+
+async def fetch_thumbnail_urls(titles: list[str], client: httpx.AsyncClient) -> tuple[dict[str, str], set[str]]:
+    """
+    Resolve article thumbnails for many titles, WIKI_BATCH_SIZE per API call.
+    Follows the API's title normalization and redirects back to the requested titles.
+    Returns ({requested title: thumbnail URL} for the titles that have one,
+    titles whose lookup request failed).
+    """
+    titles = list(dict.fromkeys(titles))
+    thumbs = {}
+    failed = set()
+    for start in range(0, len(titles), WIKI_BATCH_SIZE):
+        batch = titles[start:start + WIKI_BATCH_SIZE]
+        try:
+            resp = await client.post(WIKI_API, data={
+                "action": "query", "format": "json",
+                "prop": "pageimages", "titles": "|".join(batch),
+                "pithumbsize": 400, "pilimit": WIKI_BATCH_SIZE, "redirects": 1,
+            }, timeout=15)
+            resp.raise_for_status()
+            query = resp.json().get("query", {})
+        except Exception as e:
+            log.debug(f"   Wikipedia thumbnail lookup failed for {len(batch)} titles: {e}")
+            failed.update(batch)
+            continue
+
+        normalized = {n["from"]: n["to"] for n in query.get("normalized", [])}
+        redirects = {r["from"]: r["to"] for r in query.get("redirects", [])}
+        by_title = {}
+        for page_id, page in query.get("pages", {}).items():
+            if int(page_id) < 0:    # missing / invalid title
+                continue
+            img_url = page.get("thumbnail", {}).get("source")
+            if img_url:
+                by_title[page["title"]] = img_url
+
+        for title in batch:
+            final = normalized.get(title, title)
+            final = redirects.get(final, final)
+            if final in by_title:
+                thumbs[title] = by_title[final]
+    return thumbs, failed
+
+
+async def find_thumbnail_url(name: str, client: httpx.AsyncClient, thumbs: dict[str, str],
+                             alt_name: str = None, failed: set[str] = frozenset()) -> tuple[str | None, bool]:
     """
-    Fetch the main thumbnail image for a Wikipedia article matching 'name'.
+    Find the main thumbnail URL for a Wikipedia article matching 'name',
+    using the URLs already resolved in `thumbs` (see fetch_thumbnail_urls).
     Falls back to opensearch if direct lookup fails.
-    Returns image bytes on success, None otherwise.
+    Returns (url or None, whether every lookup completed — False means a
+    None result may just be a network error).
     """
     search_names = [name]
     if alt_name and alt_name != name:
         search_names.append(alt_name)
 
+    complete = True
     for search_name in search_names:
+        img_url = thumbs.get(search_name)
+        if img_url:
+            return img_url, True
+        complete = complete and search_name not in failed
         try:
-            # Direct page lookup by title
-            resp = session.get("https://en.wikipedia.org/w/api.php", params={
-                "action": "query", "format": "json",
-                "prop": "pageimages", "titles": search_name,
-                "pithumbsize": 400, "redirects": 1,
-            }, timeout=15)
-            resp.raise_for_status()
-            pages = resp.json().get("query", {}).get("pages", {})
-            for page_id, page in pages.items():
-                if page_id == "-1":
-                    continue
-                img_url = page.get("thumbnail", {}).get("source")
-                if img_url:
-                    img_resp = session.get(img_url, timeout=20)
-                    img_resp.raise_for_status()
-                    return img_resp.content
-
             # Fallback: opensearch to find the right article title
-            search_resp = session.get("https://en.wikipedia.org/w/api.php", params={
+            search_resp = await client.get(WIKI_API, params={
                 "action": "opensearch", "format": "json",
                 "search": search_name, "limit": 3, "namespace": 0,
             }, timeout=10)
             results = search_resp.json()
             if len(results) > 1 and results[1]:
-                for candidate_title in results[1][:3]:
-                    img_resp2 = session.get("https://en.wikipedia.org/w/api.php", params={
-                        "action": "query", "format": "json",
-                        "prop": "pageimages", "titles": candidate_title,
-                        "pithumbsize": 400, "redirects": 1,
-                    }, timeout=15)
-                    img_resp2.raise_for_status()
-                    pages2 = img_resp2.json().get("query", {}).get("pages", {})
-                    for pid2, page2 in pages2.items():
-                        if pid2 != "-1":
-                            img_url2 = page2.get("thumbnail", {}).get("source")
-                            if img_url2:
-                                img_bytes = session.get(img_url2, timeout=20).content
-                                return img_bytes
+                candidates = results[1][:3]
+                candidate_thumbs, candidate_failed = await fetch_thumbnail_urls(candidates, client)
+                for candidate_title in candidates:
+                    if candidate_title in candidate_thumbs:
+                        return candidate_thumbs[candidate_title], True
+                complete = complete and not candidate_failed
         except Exception as e:
-            log.debug(f"   Wikipedia fetch failed for '{search_name}': {e}")
-    return None
+            log.debug(f"   Wikipedia search failed for '{search_name}': {e}")
+            complete = False
+    return None, complete
+
+
+def file_digest(path: Path) -> str | None:
+    """blake2b hex digest of a file's contents, or None if it can't be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(THUMB_CHUNK):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+async def save_image(img_url: str, client: httpx.AsyncClient, dest_file: Path, hashes: dict) -> int | None:
+    """
+    Stream a thumbnail to `dest_file` in chunks, giving up past MAX_THUMB_BYTES.
+    The body goes to a .part file renamed into place when complete, so an
+    aborted download never looks like a saved headshot.
+    Bodies already saved under another name (same blake2b digest in `hashes`)
+    are hard-linked to that copy instead of stored twice, once the copy is
+    re-hashed and still holds those bytes; a stale entry is handed to this file.
+    Linked headshots share one inode, so replace a photo by writing a new file
+    over it (save-as, mv, cp --remove-destination), not by editing it in place.
+    All file I/O runs in worker threads so disk latency never stalls other downloads.
+    Returns the number of bytes written on success, None otherwise.
+    """
+    part = dest_file.with_name(f"{dest_file.name}.{uuid.uuid4().hex[:8]}.part")   # unique per download
+    try:
+        f = await asyncio.to_thread(open, part, "wb")
+        try:
+            async with client.stream("GET", img_url, timeout=20) as img_resp:
+                img_resp.raise_for_status()
+                if int(img_resp.headers.get("content-length", 0)) > MAX_THUMB_BYTES:
+                    raise ValueError(f"thumbnail larger than {MAX_THUMB_BYTES} bytes")
+                size = 0
+                digest = hashlib.blake2b(digest_size=16)
+                async for chunk in img_resp.aiter_bytes(THUMB_CHUNK):
+                    size += len(chunk)
+                    if size > MAX_THUMB_BYTES:
+                        raise ValueError(f"thumbnail larger than {MAX_THUMB_BYTES} bytes")
+                    digest.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+        if not size:
+            raise ValueError("empty thumbnail")
+
+        key = digest.hexdigest()
+        canonical = hashes.get(key)
+        if canonical and await asyncio.to_thread(file_digest, BASE_DIR / canonical) == key:
+            try:
+                await asyncio.to_thread(os.link, BASE_DIR / canonical, dest_file)
+                await asyncio.to_thread(part.unlink)
+                log.info(f"      🔗 {dest_file.name}: same image as {canonical}, hard-linked")
+                return size
+            except OSError:
+                pass    # no hard links here (or a race) — keep our own copy
+        # Claim the digest before yielding to the rename so a concurrent twin sees it.
+        # The old copy was deleted, replaced or is still in flight: either way ours will do.
+        hashes[key] = os.path.relpath(dest_file, BASE_DIR)
+        await asyncio.to_thread(os.replace, part, dest_file)
+        return size
+    except Exception as e:
+        log.debug(f"   Thumbnail download failed for {img_url}: {e}")
+        await asyncio.to_thread(part.unlink, missing_ok=True)
+        return None
+
+
+# ── Rate limiting ─────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """Async token bucket: `rate` requests/second on average, bursts of up to `rate`."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Take one token, sleeping only if the bucket is empty."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def rate_limit_hook():
+    """httpx request hook that waits on a per-host TokenBucket before every request."""
+    buckets = {}
+
+    async def hook(request: httpx.Request):
+        host = request.url.host
+        if host not in buckets:
+            buckets[host] = TokenBucket(HOST_RATES.get(host, DEFAULT_RATE))
+        await buckets[host].acquire()
+
+    return hook
+
+
+# ── Lookup cache ──────────────────────────────────────────────────────────────
+
+def open_wiki_cache() -> sqlite3.Connection:
+    """Open (creating if needed) the sqlite cache of Wikipedia lookup results."""
+    WIKI_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(WIKI_CACHE)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS wiki_lookup ("
+        " name TEXT, alt_name TEXT, url TEXT, ts INTEGER, negative INTEGER,"
+        " PRIMARY KEY (name, alt_name))"
+    )
+    return db
+
+
+def load_cached_lookups(db: sqlite3.Connection) -> dict:
+    """{(name, alt_name): url} for known thumbnails, url None for 'no image' results still within NEGATIVE_TTL."""
+    cutoff = time.time() - NEGATIVE_TTL
+    return {
+        (name, alt_name): url
+        for name, alt_name, url, ts, negative in db.execute("SELECT name, alt_name, url, ts, negative FROM wiki_lookup")
+        if not negative or ts >= cutoff
+    }
+
+
+def save_lookups(db: sqlite3.Connection, lookups: dict):
+    """Upsert {(name, alt_name): url or None} lookup results, stamped with the current time."""
+    now = int(time.time())
+    db.executemany(
+        "INSERT OR REPLACE INTO wiki_lookup (name, alt_name, url, ts, negative) VALUES (?, ?, ?, ?, ?)",
+        [(name, alt_name, url, now, int(url is None)) for (name, alt_name), url in lookups.items()],
+    )
+    db.commit()
+
+
+def forget_lookups(db: sqlite3.Connection, keys: list):
+    """Delete cached lookups, e.g. thumbnail urls that no longer download."""
+    db.executemany("DELETE FROM wiki_lookup WHERE name = ? AND alt_name = ?", keys)
+    db.commit()
 
 
 # ── Step 1: Move document scans out of persons folder ─────────────────────────
@@ -150,23 +366,35 @@ def move_document_scans():
         return 0
 
     DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
-    scans = list(GDRIVE_DIR.glob("*.jpg")) + list(GDRIVE_DIR.glob("*.png"))
+    with os.scandir(GDRIVE_DIR) as it:
+        scans = [e for e in it if e.name.endswith((".jpg", ".png")) and e.is_file()]
 
     if not scans:
         log.info(f"ℹ️  No image files in {GDRIVE_DIR.name}")
         return 0
 
     log.info(f"📦 Moving {len(scans)} document scan images → data/images/documents/")
+    # One directory listing instead of an exists() stat per scan
+    with os.scandir(DOCUMENTS_DIR) as it:
+        existing = {e.name for e in it}
+
     moved = 0
     for src in scans:
+        if src.name in existing:
+            continue
         dest = DOCUMENTS_DIR / src.name
-        if not dest.exists():
-            shutil.move(str(src), str(dest))
-            moved += 1
+        try:
+            os.rename(src.path, dest)   # same filesystem: a single rename syscall
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(src.path, dest)   # across devices: copy + unlink
+        moved += 1
 
     # Remove GDrive_Upload if now empty
-    remaining = list(GDRIVE_DIR.iterdir())
-    if not remaining:
+    with os.scandir(GDRIVE_DIR) as it:
+        empty = next(it, None) is None
+    if empty:
         GDRIVE_DIR.rmdir()
         log.info("   🗑️  Removed empty GDrive_Upload folder")
 
@@ -176,6 +404,58 @@ def move_document_scans():
 
 # ── Step 2: Download person headshots from Wikipedia ─────────────────────────
 
+async def download_one(client, sem, thumbs, failed, hashes, job, total, cached_url=None):
+    """
+    Fetch one person's headshot (bounded by `sem`), streaming it to disk.
+    Tries `cached_url` from an earlier run before searching Wikipedia again;
+    if it no longer downloads, the direct title lookup runs again before opensearch.
+    Returns (saved thumbnail url or None, lookup completed?, saved?). A url
+    that was found but failed to download counts as an incomplete lookup.
+    """
+    i, name, alt_name, dest_file, label = job
+    async with sem:
+        log.info(f"   [{i+1}/{total}] {name} → {label}/")
+        img_url, complete = cached_url, True
+        size = await save_image(img_url, client, dest_file, hashes) if img_url else None
+        if not size:
+            if cached_url:
+                # Stale cached thumbnail: cached names skipped the batched title lookup
+                log.info(f"      🔁 {name}: cached thumbnail failed, looking it up again")
+                thumbs, failed = await fetch_thumbnail_urls([t for t in (name, alt_name) if t], client)
+            img_url, complete = await find_thumbnail_url(name, client, thumbs, alt_name=alt_name, failed=failed)
+            size = await save_image(img_url, client, dest_file, hashes) if img_url else None
+
+    if size:
+        log.info(f"      ✅ {name}: saved ({size//1024} KB)")
+        return img_url, complete, True
+    log.warning(f"      ⚠️  {name}: no image found on Wikipedia")
+    return None, complete and not img_url, False
+
+
+async def download_all(jobs, total, known, hashes):
+    """Run every fetch concurrently, at most WIKI_CONCURRENCY in flight."""
+    sem = asyncio.Semaphore(WIKI_CONCURRENCY)
+    # HTTP/2: api.php and upload.wikimedia.org requests each multiplex over one kept-alive connection
+    async with httpx.AsyncClient(
+        http2=True,
+        headers={"User-Agent": USER_AGENT},
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        timeout=15.0,
+        follow_redirects=True,
+        event_hooks={"request": [rate_limit_hook()]},
+    ) as client:
+        # Resolve every uncached direct title lookup up front, 50 titles per API call
+        pending = [job for job in jobs if (job[1], job[2] or "") not in known]
+        titles = [name for _, name, _, _, _ in pending] + [alt for _, _, alt, _, _ in pending if alt]
+        thumbs, failed = await fetch_thumbnail_urls(titles, client)
+        log.info(f"   🔎 {len(thumbs)} direct thumbnail matches for {len(set(titles))} titles "
+                 f"({len(jobs) - len(pending)} cached)")
+        return await asyncio.gather(*(
+            download_one(client, sem, thumbs, failed, hashes, job, total, cached_url=known.get((job[1], job[2] or "")))
+            for job in jobs
+        ))
+
+
 def download_person_images(max_persons: int = 150):
     """Download Wikipedia headshots for top persons of interest."""
     if not POI_JSON.exists():
@@ -185,15 +465,33 @@ def download_person_images(max_persons: int = 150):
     PERSONS_DIR.mkdir(parents=True, exist_ok=True)
     VICTIMS_DIR.mkdir(parents=True, exist_ok=True)
 
-    persons = json.loads(POI_JSON.read_text())[:max_persons]
+    # orjson parses the mapped bytes directly — no UTF-8 decode into a str, no read copy
+    with open(POI_JSON, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            persons = orjson.loads(view)[:max_persons]
+
+    # One fetch per target file: keep the first person (category/bio) per safe filename
+    unique = {}
+    for person in persons:
+        unique.setdefault(safe_filename(person.get("name", "").strip()), person)
+    duplicates = len(persons) - len(unique)
+    persons = list(unique.values())
     log.info(f"🖼️  Downloading Wikipedia headshots for up to {len(persons)} persons...")
+    if duplicates:
+        log.info(f"   🧹 Dropped {duplicates} duplicate names")
 
-    session = requests.Session()
-    session.headers["User-Agent"] = "EpsteinFilesDashboard/1.0 (research; educational)"
+    db = open_wiki_cache()
+    known = load_cached_lookups(db)
+
+    # One listing per folder instead of an exists() stat per person
+    existing = {}
+    for folder in (PERSONS_DIR, VICTIMS_DIR):
+        with os.scandir(folder) as it:
+            existing[folder] = {e.name for e in it}
 
-    downloaded = 0
     skipped = 0
-    failed = 0
+    known_missing = 0
+    jobs = []
 
     for i, person in enumerate(persons):
         name = person.get("name", "").strip()
@@ -205,74 +503,147 @@ def download_person_images(max_persons: int = 150):
         # Decide destination folder
         victim = is_victim(name, category, bio)
         target_dir = VICTIMS_DIR if victim else PERSONS_DIR
-        dest_file = target_dir / safe_filename(name)
+        dest_name = safe_filename(name)
 
-        if dest_file.exists():
+        if dest_name in existing[target_dir]:
             skipped += 1
             continue
+        dest_file = target_dir / dest_name
 
         label = "victims" if victim else "persons"
-        log.info(f"   [{i+1}/{len(persons)}] {name} → {label}/")
 
         # Use alternate search term for victims where available
         alt_name = None
         if victim:
-            for vkey, valt in VICTIM_SEARCH_TERMS.items():
-                if vkey in name.lower() and valt:
-                    alt_name = valt
-                    break
+            match = VICTIM_ALT_RE.search(name.lower())
+            if match:
+                alt_name = VICTIM_ALT_TERMS[match.lastgroup]
+
+        # Recently confirmed to have no Wikipedia image — don't ask again
+        key = (name, alt_name or "")
+        if key in known and known[key] is None:
+            known_missing += 1
+            continue
 
-        img_bytes = fetch_wikipedia_image(name, session, alt_name=alt_name)
+        jobs.append((i, name, alt_name, dest_file, label))
 
-        if img_bytes:
-            dest_file.write_bytes(img_bytes)
-            downloaded += 1
-            log.info(f"      ✅ Saved ({len(img_bytes)//1024} KB)")
-        else:
-            failed += 1
-            log.warning(f"      ⚠️  No image found on Wikipedia")
+    hashes = orjson.loads(IMAGE_HASHES.read_bytes()) if IMAGE_HASHES.exists() else {}
+    results = asyncio.run(download_all(jobs, len(persons), known, hashes)) if jobs else []
+    IMAGE_HASHES.write_bytes(orjson.dumps(hashes))
+    # Remember saved urls, and "no image" only when the lookup didn't hit a network error
+    save_lookups(db, {
+        (job[1], job[2] or ""): url
+        for job, (url, complete, _) in zip(jobs, results)
+        if url or complete
+    })
+    # Cached urls that failed and found no replacement: look them up from scratch next run
+    forget_lookups(db, [
+        (job[1], job[2] or "") for job, (url, complete, _) in zip(jobs, results)
+        if known.get((job[1], job[2] or "")) and not url and not complete
+    ])
+    db.close()
 
-        time.sleep(0.3)  # Respectful rate limiting
+    downloaded = sum(saved for _, _, saved in results)
+    failed = len(results) - downloaded
 
-    log.info(f"\n   📸 Downloaded: {downloaded} | Skipped (cached): {skipped} | Not found: {failed}")
+    log.info(f"\n   📸 Downloaded: {downloaded} | Skipped (cached): {skipped} | Not found: {failed}"
+             f" | Known misses: {known_missing}")
 
 
 # ── Step 3: Rebuild image index ───────────────────────────────────────────────
 
+@dataclass(slots=True)
+class ImageEntry:
+    """One indexed image. Slotted (no per-instance dict); orjson writes it as the same JSON object."""
+    path: str
+    filename: str
+    category: str
+    size_bytes: int
+
+
+def scan_image_dir(root: str, manifest: dict, fresh: dict):
+    """
+    Yield (folder path, folder name, [filename, size or None]) for every indexable
+    image under `root`, a folder's own files before its subfolders' (rglob's order).
+    A folder whose mtime still matches its `manifest` entry is replayed from it with
+    no listing and no stat; any other folder is re-listed via os.scandir, its sizes
+    left None for the caller to fill. Every visited folder is recorded in `fresh`.
+    """
+    try:
+        mtime = os.stat(root).st_mtime_ns    # before listing: a concurrent change shows up next run
+    except FileNotFoundError:
+        return
+    rel = os.path.relpath(root, BASE_DIR)
+    folder = os.path.basename(root)
+    cached = manifest.get(rel)
+    if cached and cached["mtime_ns"] == mtime:
+        images, subdirs = cached["images"], cached["subdirs"]
+    else:
+        with os.scandir(root) as it:
+            entries = list(it)
+        images, subdirs = [], []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            # Skip document scans (not person photos)
+            elif (folder != "documents" and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTS
+                  and entry.is_file()):
+                images.append([entry.name, None])
+    fresh[rel] = {"mtime_ns": mtime, "images": images, "subdirs": subdirs}
+    for record in images:
+        yield root, folder, record
+    for name in subdirs:
+        yield from scan_image_dir(os.path.join(root, name), manifest, fresh)
+
+
 def build_image_index():
-    """Scan all image subfolders and build name→image mapping."""
+    """
+    Scan all image subfolders and build name→image mapping.
+    Folders unchanged since the last run (same mtime in IMAGE_MANIFEST) are
+    taken from the manifest, so the moves and downloads of steps 1–2 are
+    the only folders re-listed. Everything this script writes lands via a
+    rename, which bumps the folder mtime; a file edited in place keeps its
+    recorded size until its folder changes.
+    """
     log.info("\n🔗 Rebuilding image index...")
     IMAGE_INDEX_OUT.parent.mkdir(parents=True, exist_ok=True)
 
-    image_index = {}
-    for img_path in IMAGES_DIR.rglob("*"):
-        if not img_path.is_file():
-            continue
-        if img_path.suffix.lower() not in (".jpg", ".jpeg", ".png", ".gif", ".webp"):
-            continue
-        # Skip document scans (not person photos)
-        if img_path.parent.name == "documents":
-            continue
-
-        name_key = img_path.stem.replace("_", " ").replace("-", " ").strip().title()
-        rel_path = str(img_path.relative_to(BASE_DIR))
-        category = img_path.parent.name  # 'persons' or 'victims'
-
-        if name_key not in image_index:
-            image_index[name_key] = []
-        image_index[name_key].append({
-            "path": rel_path,
-            "filename": img_path.name,
-            "category": category,
-            "size_bytes": img_path.stat().st_size,
-        })
+    try:
+        manifest = orjson.loads(IMAGE_MANIFEST.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        manifest = {}
+    fresh = {}
+    found = list(scan_image_dir(str(IMAGES_DIR), manifest, fresh))   # folder: 'persons' or 'victims'
+    reused = sum(1 for rel, entry in fresh.items() if manifest.get(rel, {}).get("mtime_ns") == entry["mtime_ns"])
+
+    # Only files from re-listed folders need a stat; it's I/O-bound on cold caches — fan it out
+    unsized = [(root, record) for root, _, record in found if record[1] is None]
+    with ThreadPoolExecutor(max_workers=STAT_WORKERS) as pool:
+        sizes = pool.map(lambda item: os.stat(os.path.join(item[0], item[1][0])).st_size, unsized)
+        for (_, record), size in zip(unsized, sizes):
+            record[1] = size
 
-    IMAGE_INDEX_OUT.write_text(json.dumps(image_index, indent=2))
+    image_index = {}
+    for root, category, (filename, size) in found:
+        stem = os.path.splitext(filename)[0]
+        image_index.setdefault(normalize_name_key(stem), []).append(
+            ImageEntry(os.path.relpath(os.path.join(root, filename), BASE_DIR), filename, category, size)
+        )
+    log.info(f"   📂 {len(fresh)} folders, {reused} unchanged since last run, {len(unsized)} files stat'ed")
+
+    # Compact orjson bytes, no intermediate str (download_data.py calls this same function).
+    # Written beside the target then os.replace'd, so an interrupted run never leaves a truncated index
+    tmp = IMAGE_INDEX_OUT.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(image_index))
+    os.replace(tmp, IMAGE_INDEX_OUT)
+    tmp = IMAGE_MANIFEST.with_suffix(".json.tmp")
+    tmp.write_bytes(orjson.dumps(fresh))
+    os.replace(tmp, IMAGE_MANIFEST)
     log.info(f"   ✅ Indexed {len(image_index)} persons with images")
 
     # Stats
-    persons_count = sum(1 for v in image_index.values() if any(i["category"] == "persons" for i in v))
-    victims_count = sum(1 for v in image_index.values() if any(i["category"] == "victims" for i in v))
+    persons_count = sum(1 for v in image_index.values() if any(i.category == "persons" for i in v))
+    victims_count = sum(1 for v in image_index.values() if any(i.category == "victims" for i in v))
     log.info(f"   👤 Persons: {persons_count} | 💔 Victims: {victims_count}")
 
     return image_index